@@ -22,12 +22,105 @@
 # SOFTWARE.
 
 import gdb
+import functools
+import struct
 from .lib import *
 
 
+# Target byte order, as configured in gdb. Looked up once per command, since
+# it only changes by user command or when a new target is loaded.
+byteorder_cache = {}
+
+
+def clear_byteorder_cache(event=None):
+    byteorder_cache.clear()
+
+
+gdb.events.before_prompt.connect(clear_byteorder_cache)
+gdb.events.new_objfile.connect(clear_byteorder_cache)
+gdb.events.clear_objfiles.connect(clear_byteorder_cache)
+
+
+def target_byteorder():
+    """
+    Byte order of the target, either 'little' or 'big'
+    """
+    if 'target' not in byteorder_cache:
+        endian = gdb.parameter("endian")
+        if endian == "auto":
+            # "The target endianness is set automatically (currently little
+            # endian)"
+            endian = gdb.execute("show endian", to_string=True)
+        byteorder_cache['target'] = 'big' if 'big' in endian else 'little'
+    return byteorder_cache['target']
+
+
+def byteorder(addr):
+    """
+    Byte order of memory at addr. The Private Peripheral Bus, holding the SCB,
+    NVIC, SysTick and FPU registers, is always little endian.
+    """
+    if 0xE0000000 <= addr < 0xE0100000:
+        return 'little'
+    return target_byteorder()
+
+
+_STRUCT_ORDER = {'little': '<', 'big': '>'}
+_UNPACK_U32 = {
+    order: struct.Struct(prefix + 'I').unpack_from
+    for order, prefix in _STRUCT_ORDER.items()
+}
+
+
+@functools.lru_cache(maxsize=32)
+def words_struct(order, count):
+    """
+    Precompiled struct for an array of count 32 bit words in the byte order
+    """
+    return struct.Struct('%s%dI' % (_STRUCT_ORDER[order], count))
+
+
 def read_reg(inf, addr, len):
-    bs = inf.read_memory(addr, len).tobytes()
-    return sum(v << (8*i) for i, v in enumerate(bs))
+    if len == 4:
+        return _UNPACK_U32[byteorder(addr)](inf.read_memory(addr, 4))[0]
+    return int.from_bytes(inf.read_memory(addr, len), byteorder(addr))
+
+
+def read_words(inf, addr, count):
+    """
+    Read an array of 32 bit words using a single memory read
+    """
+    return words_struct(byteorder(addr), count).unpack_from(
+        inf.read_memory(addr, 4*count))
+
+
+def read_regs(inf, regs, max_gap=128):
+    """
+    Read a list of RegisterDef, merging registers close to each other into a
+    single memory read. Returns a dict from address to register value.
+    """
+    values = {}
+    ranges = [(reg.addr, reg.size) for reg in regs]
+    for start, length, members in coalesce_ranges(ranges, max_gap):
+        try:
+            mem = inf.read_memory(start, length)
+        except gdb.MemoryError:
+            # Gap not readable, fall back to reading registers one by one
+            for addr, size in members:
+                values[addr] = read_reg(inf, addr, size)
+            continue
+        order = byteorder(start)
+        if all(size == 4 and (addr - start) % 4 == 0 for addr, size in members):
+            # Only aligned 32 bit registers, decode the whole block at once
+            words = words_struct(order, length // 4).unpack_from(mem)
+            for addr, size in members:
+                values[addr] = words[(addr - start) // 4]
+        else:
+            # Slicing the memoryview doesn't copy the data
+            for addr, size in members:
+                offset = addr - start
+                values[addr] = int.from_bytes(mem[offset:offset+size], order)
+    return values
 
 
 class ArgType:
@@ -53,17 +146,25 @@ class ArgType:
 
 
 class ArgCommand(gdb.Command):
+    # Largest gap between registers still merged into one read by emit_regs()
+    read_gap = 128
+
     def __init__(self, name, command_class=gdb.COMMAND_USER):
         super().__init__(name, command_class)
         self.name = name
         self.arg_list = []
         self.arg_mods = []
+        # Modifier letter to name, and all modifiers unset
+        self.mod_names = {}
+        self.mod_defaults = {}
 
     def add_arg(self, argtype):
         self.arg_list.append(argtype)
 
     def add_mod(self, letter, name):
         self.arg_mods.append((letter, name))
+        self.mod_names[letter] = name
+        self.mod_defaults[name] = False
 
     def complete(self, text, word):
         args = gdb.string_to_argv(text)
@@ -104,10 +205,11 @@ class ArgCommand(gdb.Command):
             if not argtype.optional and len(args) <= i:
                 return None
 
-        values = {}
+        values = dict(self.mod_defaults)
 
-        for m_letter, m_name in self.arg_mods:
-            values[m_name] = mods.count(m_letter) > 0
+        for m_letter in mods:
+            if m_letter in self.mod_names:
+                values[self.mod_names[m_letter]] = True
 
         for cur_arg, cur_argtype in zip(args, self.arg_list):
             values[cur_argtype.name] = cur_argtype.get(cur_arg, values)
@@ -124,126 +226,282 @@ class ArgCommand(gdb.Command):
         ]
         print("Usage:", *args)
 
+    def emit_regs(self, inf, sections, args, out=None):
+        """
+        Read and print sections of registers, given as (name, regs) pairs
+
+        Everything is read from the target before any of it is formatted, and
+        the whole printout is written at once. A section named None is printed
+        without a header. Text already in out is printed first.
+        """
+        sections = list(sections)
+        base = 1 if args['binary'] else 4
+        if out is None:
+            out = []
+
+        # Read all sections together, as neighbouring sections may share reads
+        values = read_regs(inf, [reg for name, regs in sections for reg in regs],
+                           self.read_gap)
+
+        for name, regs in sections:
+            if name is not None:
+                if out:
+                    out.append("\n")
+                out.append("%s registers:\n" % (name,))
+            out.append(self.render_regs(regs, values, args['descr'], base,
+                                        args['all']))
+
+        gdb.write("".join(out))
+
+    def render_regs(self, regs, values, include_descr, base, all):
+        out = []
+        for reg in regs:
+            reg.render(out, values[reg.addr], include_descr,
+                       base=base, all=all)
+        return "".join(out)
+
 
 class RegisterDef:
-    def __init__(self, name, descr, addr, size, fields=[]):
+    __slots__ = ('name', 'descr', 'addr', 'size', 'fields', '_extract',
+                 'reset', '_reset_fields', '_name_col', '_descr_col')
+
+    def __init__(self, name, descr, addr, size, fields=[], reset=0):
         self.name = name
         self.descr = descr
         self.addr = addr
         self.size = size
         self.fields = fields
+        self.reset = reset
+        # Fixed parts of the printout
+        self._name_col = "%-32s = " % (name,)
+        self._descr_col = (" "*18 + "// " + descr) if descr else ""
+        # Shift and mask of every field, to extract all field values in one go
+        self._extract = [(field._shift, field._mask) for field in fields]
+        # Fields, and their values, printed when the register holds its reset
+        # value. The common case for status and configuration registers
+        self._reset_fields = [
+            (field, field_value)
+            for field, field_value in zip(fields, self.extract(reset))
+            if field.should_print(field_value)
+        ]
 
-    def dump(self, inf, include_descr=True, base=4, all=False):
-        m_int = read_reg(inf, self.addr, self.size)
-
-        if self.descr and include_descr:
-            descr = (" "*18 + "// " + self.descr)
-        else:
-            descr = ""
-
+    def render(self, out, m_int, include_descr=True, base=4, all=False):
+        """
+        Append the printout of the register, given its value, to the list out
+        """
         field_align = "%%%ds" % (32//base)
-        print(("%-32s = "+field_align+" %s") %
-              (self.name, format_int(m_int, self.size * 8, base=base), descr)
-              )
-
-        for field in self.fields:
-            if all or field.should_print(m_int):
-                field.print(m_int, include_descr, base=base)
+        out.append(self._name_col +
+                   (field_align+" %s\n") %
+                   (format_int(m_int, self.size * 8, base=base),
+                    self._descr_col if include_descr else "")
+                   )
+
+        if m_int == self.reset and not all:
+            for field, field_value in self._reset_fields:
+                out.append(field.render(m_int, field_value,
+                                        include_descr, base=base))
+            return
+
+        for field, field_value in zip(self.fields, self.extract(m_int)):
+            if all or field.should_print(field_value):
+                out.append(field.render(m_int, field_value,
+                                        include_descr, base=base))
+
+    def extract(self, m_int):
+        """
+        Get the value of every field, given the register value
+        """
+        return [(m_int >> shift) & mask for shift, mask in self._extract]
+
+    def for_tags(self, tags):
+        """
+        Get the register definition for a CPU model, given a set of tags as for
+        filt(). Returns self unless any field depends on the model.
+        """
+        fields = [field.for_tags(tags) for field in self.fields]
+        if all(new is old for new, old in zip(fields, self.fields)):
+            return self
+        return RegisterDef(self.name, self.descr, self.addr, self.size, fields,
+                           self.reset)
+
+
+class RegisterDefTagged(RegisterDef):
+    """
+    Register where the availability of fields depends on the CPU model.
+
+    The fields are given as a list of (tags, field) tuples, as for filt(). As
+    is, all fields are included. Use for_tags() to get the definition for a
+    given model.
+    """
+
+    __slots__ = ('tagged_fields',)
+
+    def __init__(self, name, descr, addr, size, tagged_fields, reset=0):
+        super().__init__(name, descr, addr, size,
+                         list(filt(None, tagged_fields)), reset)
+        self.tagged_fields = tagged_fields
+
+    def for_tags(self, tags):
+        fields = [field.for_tags(tags) for field in filt(tags, self.tagged_fields)]
+        return RegisterDef(self.name, self.descr, self.addr, self.size, fields,
+                           self.reset)
+
+
+def parse_fields(text):
+    """
+    Create a list of (tags, FieldBitfield) from a compact table, as described
+    in parse_field_table(). Intended for RegisterDefTagged
+    """
+    return [
+        (tags, FieldBitfield(name, offset, width, descr, always=always))
+        for tags, name, offset, width, always, descr in parse_field_table(text)
+    ]
 
 
 class Field:
+    __slots__ = ('name', 'descr', 'always', '_name_col', '_descr_col')
+
+    # Extracting a field value from a register value gives 0 by default
+    _shift = 0
+    _mask = 0
+
     def __init__(self, name, descr=None, always=False):
         self.name = name
         self.descr = descr
         self.always = always
+        # Fixed parts of the printout
+        self._name_col = "    %-28s   " % (name,)
+        self._descr_col = (" // " + descr) if descr else ""
+
+    def for_tags(self, tags):
+        return self
 
-    def should_print(self, value):
+    def should_print(self, field_value):
         return False
 
     def get_value(self, value):
-        return 0
+        return (value >> self._shift) & self._mask
 
     def get_print_bits(self, value, base=4):
         return format_int(value, 32, 0, 0, base)
 
-    def get_print_value(self, value):
+    def get_print_value(self, field_value):
         return None
 
-    def print(self, value, include_descr=True, base=4):
-        if self.descr and include_descr:
-            descr = (" // " + self.descr)
-        else:
-            descr = ""
-
+    def render(self, value, field_value, include_descr=True, base=4):
+        """
+        Get the printout line of the field, given the register value
+        """
         field_align = "%%%ds" % (32//base)
-        print(
-            ("    %-28s   "+field_align+" - %-15s%s") %
+        return self._name_col + (
+            (field_align+" - %-15s%s\n") %
             (
-                self.name,
                 self.get_print_bits(value, base=base),
-                self.get_print_value(value),
-                descr
+                self.get_print_value(field_value),
+                self._descr_col if include_descr else ""
             )
         )
 
 
 class FieldBitfield(Field):
+    __slots__ = ('bit_offset', 'bit_width', '_shift', '_mask')
+
     def __init__(self, name, bit_offset, bit_width, descr=None, always=False):
         super().__init__(name, descr, always=always)
         self.bit_offset = bit_offset
         self.bit_width = bit_width
+        self._shift = bit_offset
+        self._mask = (1 << bit_width)-1
 
-    def should_print(self, value):
-        return self.always or self.get_value(value) != 0
-
-    def get_value(self, value):
-        return (value >> self.bit_offset) & ((1 << self.bit_width)-1)
+    def should_print(self, field_value):
+        return self.always or field_value != 0
 
     def get_print_bits(self, value, base=4):
         return format_int(value, 32, self.bit_offset, self.bit_width, base)
 
-    def get_print_value(self, value):
-        return format_int(self.get_value(value), self.bit_width)
+    def get_print_value(self, field_value):
+        return format_int(field_value, self.bit_width)
 
 
 class FieldBitfieldEnum(FieldBitfield):
+    __slots__ = ('enum_map',)
+
     def __init__(self, name, bit_offset, bit_width, enum_values, descr=None, always=False):
         super().__init__(name, bit_offset, bit_width, descr, always=always)
-        self.enum_values = enum_values
+        if isinstance(enum_values, dict):
+            self.enum_map = enum_values
+        else:
+            self.enum_map = self.build_enum(enum_values)
 
-    def get_enum_value(self, value):
-        my_value = self.get_value(value)
-        for enum_value in self.enum_values:
-            if my_value == enum_value[0]:
-                return enum_value
-        return None
+    @staticmethod
+    def build_enum(enum_values):
+        """
+        Build a lookup of enum values, which can be shared between fields
+
+        The first entry wins on duplicate values
+        """
+        enum_map = {}
+        for enum_value in enum_values:
+            enum_map.setdefault(enum_value[0], enum_value)
+        return enum_map
+
+    @classmethod
+    def from_shared(cls, name, bit_offset, bit_width, enum_map, descr=None, always=False):
+        return cls(name, bit_offset, bit_width, enum_map, descr, always=always)
 
-    def get_print_value(self, value):
+    def get_enum_value(self, field_value):
+        return self.enum_map.get(field_value)
+
+    def get_print_value(self, field_value):
         try:
-            v, is_default, name, descr = self.get_enum_value(value)
+            v, is_default, name, descr = self.get_enum_value(field_value)
             return name
         except:
-            return format_int(self.get_value(value), self.bit_width)
+            return format_int(field_value, self.bit_width)
 
-    def should_print(self, value):
+    def should_print(self, field_value):
         if self.always:
             return True
         try:
-            v, is_default, name, descr = self.get_enum_value(value)
+            v, is_default, name, descr = self.get_enum_value(field_value)
             return not is_default
         except:
             return True
 
 
+class FieldBitfieldEnumTagged(FieldBitfieldEnum):
+    """
+    Enum field where the enum values depends on the CPU model. The values are
+    given as (tags, enum_value) tuples as for filt(). Use for_tags() to get the
+    field for a given model.
+    """
+
+    __slots__ = ('tagged_values',)
+
+    def __init__(self, name, bit_offset, bit_width, tagged_values, descr=None, always=False):
+        super().__init__(name, bit_offset, bit_width,
+                         filt(None, tagged_values), descr, always=always)
+        self.tagged_values = tagged_values
+
+    def for_tags(self, tags):
+        return FieldBitfieldEnum(self.name, self.bit_offset, self.bit_width,
+                                 filt(tags, self.tagged_values), self.descr,
+                                 always=self.always)
+
+
 class FieldBitfieldMap(FieldBitfield):
+    __slots__ = ('map_func',)
+
     def __init__(self, name, bit_offset, bit_width, map_func, descr=None, always=False):
         super().__init__(name, bit_offset, bit_width, descr, always=always)
         self.map_func = map_func
 
-    def get_print_value(self, value):
-        return self.map_func(self.get_value(value))
+    def get_print_value(self, field_value):
+        return self.map_func(field_value)
 
 class FieldBit(FieldBitfield):
+    __slots__ = ('bit',)
+
     def __init__(self, name, bit, descr=None, always=False):
         super().__init__(name, bit, 1, descr, always=always)
         self.bit = bit
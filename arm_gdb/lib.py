@@ -21,9 +21,14 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import functools
+
 #
 # Library functions, that can be tested outside of gdb. used for type
 #
+_BASE_FORMAT = {1: 'b', 3: 'o', 4: 'x'}
+
+
 def base_convert(val, base, bits):
     """
     Convert a value to string, given base
@@ -41,11 +46,23 @@ def base_convert(val, base, bits):
     '1100101011111110'
     >>> base_convert(0, 1, 16)
     '0000000000000000'
+    >>> base_convert(0x1ff, 4, 8)
+    'ff'
+    >>> base_convert(0xe4, 2, 8)
+    '3210'
     """
+    num_digits = (bits + base - 1) // base
+
+    # Binary, octal and hex are handled by the builtin formatter, only fall
+    # back to the digit loop for the remaining bases
+    fmt = _BASE_FORMAT.get(base)
+    if fmt is not None:
+        val &= (1 << (num_digits * base)) - 1
+        return format(val, '0%d%s' % (num_digits, fmt))
+
     digits = '0123456789abcdef'
 
     bitmask = (1 << base)-1
-    num_digits = (bits + base - 1) // base
 
     outp = [0] * num_digits
     for i in range(num_digits):
@@ -57,6 +74,9 @@ def base_convert(val, base, bits):
     return "".join(digits[v] for v in outp)
 
 
+_MASK_STR_CACHE = {}
+
+
 def format_int(val, bits, bit_offset=0, bit_length=None, base=4):
     """
     >>> format_int(0x12345678, 32)
@@ -77,9 +97,13 @@ def format_int(val, bits, bit_offset=0, bit_length=None, base=4):
     mask = ((1 << bit_length)-1) << bit_offset
     val &= mask
 
-    # Generate printout of both number and mask
+    # Generate printout of both number and mask. Only a few field layouts
+    # exist, so keep the mask printouts
     val_str = base_convert(val, base, bits)
-    mask_str = base_convert(mask, base, bits)
+    mask_key = (bits, bit_offset, bit_length, base)
+    mask_str = _MASK_STR_CACHE.get(mask_key)
+    if mask_str is None:
+        mask_str = _MASK_STR_CACHE[mask_key] = base_convert(mask, base, bits)
     # replace all digits in val_str that's zero in mask
     return "".join('.' if m == '0' else v for v, m in zip(val_str, mask_str))
 
@@ -96,25 +120,117 @@ def filt(tags, list):
     If either tags is None or the first element in the tuple is None, then the
     element will be included
 
-    >>> filt({'a', 'x'}, [(None, 'x'), ('a,b', 'y')])
+    The elements are yielded, use list() where a list is needed
+
+    >>> list(filt({'a', 'x'}, [(None, 'x'), ('a,b', 'y')]))
     ['x', 'y']
 
-    >>> filt({'c', 'x'}, [(None, 'x'), ('a,b', 'y')])
+    >>> list(filt({'c', 'x'}, [(None, 'x'), ('a,b', 'y')]))
     ['x']
 
-    >>> filt(None, [(None, 'x'), ('a,b', 'y')])
+    >>> list(filt(None, [(None, 'x'), ('a,b', 'y')]))
     ['x', 'y']
     """
 
-    return [
-        v
-        for m, v in list
+    for m, v in list:
         if (
             tags is None or
             m is None or
-            len(set(m.split(",")) & tags) > 0
+            not tags.isdisjoint(split_tags(m))
+        ):
+            yield v
+
+
+@functools.lru_cache(maxsize=None)
+def split_tags(m):
+    """
+    Convert a comma separated list of tags to a set. Cached, since the same
+    tag strings are used over and over again in the register tables.
+
+    >>> sorted(split_tags('v7,v8'))
+    ['v7', 'v8']
+    """
+    return frozenset(m.split(","))
+
+
+def parse_field_table(text):
+    """
+    Parse a compact table of bit fields, one field per line as:
+
+        <name> <offset> <width> [<tags>] [always] [: <description>]
+
+    The offset can be written as a sum, like 7+8. Tags are a comma separated
+    list as for filt(). Empty lines are ignored.
+
+    Yields tuples of (tags, name, offset, width, always, description)
+
+    >>> for f in parse_field_table('''
+    ...     MMFSR      0    8       always : MemManage Fault Status Register
+    ...     IACCVIOL   0+8  1
+    ...     STKOF      4+16 1  v8          : Stack overflow: occurred.
+    ... '''):
+    ...     print(f)
+    (None, 'MMFSR', 0, 8, True, 'MemManage Fault Status Register')
+    (None, 'IACCVIOL', 8, 1, False, None)
+    ('v8', 'STKOF', 20, 1, False, 'Stack overflow: occurred.')
+    """
+    for line in text.splitlines():
+        spec, sep, descr = line.partition(':')
+        words = spec.split()
+        if len(words) == 0:
+            continue
+
+        name, offset, width = words[:3]
+        tags = None
+        always = False
+        for word in words[3:]:
+            if word == 'always':
+                always = True
+            else:
+                tags = word
+
+        yield (
+            tags,
+            name,
+            sum(int(v) for v in offset.split('+')),
+            int(width),
+            always,
+            descr.strip() if sep else None
         )
-    ]
+
+
+def coalesce_ranges(ranges, max_gap=0):
+    """
+    Merge memory ranges that are close to each other, to be able to read them
+    using fewer requests.
+
+    Ranges are tuples of (address, size). Two ranges are merged if not more
+    than max_gap bytes are between them.
+
+    Returns a list of tuples (address, size, members) in address order, where
+    members is a list of the original ranges covered by the merged range.
+
+    >>> coalesce_ranges([(0x10, 4), (0x0, 4), (0x4, 4)])
+    [(0, 8, [(0, 4), (4, 4)]), (16, 4, [(16, 4)])]
+
+    >>> coalesce_ranges([(0x10, 4), (0x0, 4), (0x4, 4)], 8)
+    [(0, 20, [(0, 4), (4, 4), (16, 4)])]
+
+    >>> coalesce_ranges([(0x4, 4), (0x4, 4)])
+    [(4, 4, [(4, 4), (4, 4)])]
+
+    >>> coalesce_ranges([])
+    []
+    """
+    merged = []
+    for addr, size in sorted(ranges):
+        if merged and addr - merged[-1][1] <= max_gap:
+            cur = merged[-1]
+            cur[1] = max(cur[1], addr + size)
+            cur[2].append((addr, size))
+        else:
+            merged.append([addr, addr + size, [(addr, size)]])
+    return [(start, end - start, members) for start, end, members in merged]
 
 
 if __name__ == "__main__":
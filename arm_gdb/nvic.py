@@ -84,12 +84,15 @@ Examples:
 
         inf = gdb.selected_inferior()
 
+        # SCB block from VTOR (0xE000ED08) up to SHCSR (0xE000ED24), decoded in
+        # one go: VTOR, AIRCR, SCR, CCR, SHPR1-3, SHCSR
+        SCB = read_words(inf, 0xE000ED08, 8)
+
         if 'vtor' in args:
             VTOR = gdb.parse_and_eval(args['vtor'])
         else:
             # Vector Table Offset Register
-            VTOR = read_reg(inf, 0xE000ED08, 4)
-            STIR = read_reg(inf, 0xE000E010, 4)
+            VTOR = SCB[0]
 
         # TODO: ARMv6-M only supports 32 interrupts and no ICTR register.
         # Assume for now that ICTR reads 0 on ARMv6, which matches count=32, but
@@ -100,28 +103,31 @@ Examples:
             count = 496
 
         # Maskable handlers
-        SHPR = [read_reg(inf, 0xE000ED18 + 4*i, 4) for i in range(3)]
+        SHPR = SCB[4:7]
 
         # Status registers
         status_regs = [
-            read_reg(inf, 0xE000ED24, 4),  # SHCRS
+            SCB[7],  # SHCRS
             read_reg(inf, 0xE000E010, 4),  # SYST_CSR
         ]
 
         reg_count = (count + 31) // 32
         prioreg_count = (count + 3) // 4
 
-        NVIC_ISER = [read_reg(inf, 0xE000E100 + 4*i, 4) for i in range(reg_count)]
-        # NVIC_ICER = [read_reg(inf, 0XE000E180 + 4*i, 4) for i in range(reg_count)]
-        NVIC_ISPR = [read_reg(inf, 0XE000E200 + 4*i, 4) for i in range(reg_count)]
-        # NVIC_ICPR = [read_reg(inf, 0XE000E280 + 4*i, 4) for i in range(reg_count)]
-        NVIC_IABR = [read_reg(inf, 0xE000E300 + 4*i, 4) for i in range(reg_count)]
-        NVIC_IPR = [read_reg(inf, 0xE000E400 + 4*i, 4) for i in range(prioreg_count)]
+        NVIC_ISER = read_words(inf, 0xE000E100, reg_count)
+        # NVIC_ICER = read_words(inf, 0XE000E180, reg_count)
+        NVIC_ISPR = read_words(inf, 0XE000E200, reg_count)
+        # NVIC_ICPR = read_words(inf, 0XE000E280, reg_count)
+        NVIC_IABR = read_words(inf, 0xE000E300, reg_count)
+        NVIC_IPR = read_words(inf, 0xE000E400, prioreg_count)
+
+        # The whole vector table, from the initial stack pointer and up
+        vectors = read_words(inf, VTOR, 16+count)
 
-        print("IRQn Prio          Handler")
+        out = ["IRQn Prio          Handler\n"]
 
         for IRQn in range(-15, count):
-            handler_addr = read_reg(inf, VTOR + 4*(16+IRQn), 4)
+            handler_addr = vectors[16+IRQn]
             handler_func = gdb.block_for_pc(handler_addr)
             if handler_func is None:
                 handler_name = ""
@@ -162,7 +168,7 @@ Examples:
                 prio = (NVIC_IPR[IRQn//4] >> (8*(IRQn % 4))) & 0xff
 
             if enabled or args['all']:
-                print("%4d %4x %s %s %s %08x %s%s" % (
+                out.append("%4d %4x %s %s %s %08x %s%s\n" % (
                     IRQn,
                     prio,
                     "en" if enabled else "  ",
@@ -172,3 +178,5 @@ Examples:
                     name,
                     handler_name
                 ))
+
+        gdb.write("".join(out))
@@ -92,16 +92,17 @@ Examples:
             self.print_help()
             return
 
+        out = []
         if not 'device' in args:
-            print("Devices loaded:")
+            out.append("Devices loaded:\n")
             for device in devices.keys():
-                print(" -", device)
+                out.append(" - %s\n" % (device,))
         elif not 'peripheral' in args:
             device = args['device']
-            print("Peripherals:")
+            out.append("Peripherals:\n")
             for peripheral in device.peripherals:
-                print(
-                    "%-10s @ 0x%08x" % (
+                out.append(
+                    "%-10s @ 0x%08x\n" % (
                         peripheral.name,
                         peripheral.base_address
                     )
@@ -109,15 +110,15 @@ Examples:
         else:
             device = args['device']
             peripheral = args['peripheral']
-            print(
-                "Registers in %s @ 0x%08x:" % (
+            out.append(
+                "Registers in %s @ 0x%08x:\n" % (
                     peripheral.name,
                     peripheral.base_address
                 )
             )
             for register in peripheral.registers:
-                print(
-                    " - %s @ +0x%x" % (
+                out.append(
+                    " - %s @ +0x%x\n" % (
                         register.name,
                         register.address_offset
                     )
@@ -126,7 +127,9 @@ Examples:
                     mask = "." * (32-field.bit_offset-field.bit_width) + \
                         "#" * field.bit_width + "." * field.bit_offset
 
-                    print("        %s %s" % (mask, field.name))
+                    out.append("        %s %s\n" % (mask, field.name))
+
+        gdb.write("".join(out))
 
 
 class ArmToolsSVDInspect (ArgCommand):
@@ -144,6 +147,10 @@ Modifier /b prints bitmasks in binary instead of hex
 Exmaple: arm inspect nrf52840 UARTE0
 """
 
+    # Holes in vendor peripherals may alias registers with read side effects,
+    # or fault, so only merge registers that are strictly adjacent
+    read_gap = 0
+
     def __init__(self):
         super().__init__('arm inspect', gdb.COMMAND_DATA)
         self.add_arg(DevicesArgType('device'))
@@ -158,12 +165,11 @@ Exmaple: arm inspect nrf52840 UARTE0
             self.print_help()
             return
 
-        base = 1 if args['binary'] else 4
-
         peripheral = args['peripheral']
 
         inf = gdb.selected_inferior()
 
+        regs = []
         for register in peripheral.registers:
             fields = []
             for field in register._fields:
@@ -185,14 +191,15 @@ Exmaple: arm inspect nrf52840 UARTE0
                         field.bit_width,
                         field.description
                     ))
-            reg = RegisterDef(
+            regs.append(RegisterDef(
                 peripheral.name + "." + register.name,
                 register.description,
                 peripheral.base_address + register.address_offset,
                 4,
                 fields
-            )
-            reg.dump(inf, args['descr'], base=base, all=args['all'])
+            ))
+
+        self.emit_regs(inf, [(None, regs)], args)
 
 
 class ArmToolsSVDLoadFile (ArgCommand):
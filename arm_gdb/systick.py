@@ -68,8 +68,5 @@ Modifier /b prints bitmasks in binary instead of hex
             self.print_help()
             return
 
-        base = 1 if args['binary'] else 4
-
         inf = gdb.selected_inferior()
-        for reg in self.regs:
-            reg.dump(inf, args['descr'], base=base, all=args['all'])
+        self.emit_regs(inf, [(None, self.regs)], args)